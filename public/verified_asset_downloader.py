@@ -5,16 +5,38 @@ Se enfoca en fuentes reales y activas con nombres de archivos útiles.
 """
 
 import os
+import re
 import urllib.request
 import json
 from pathlib import Path
 import zipfile
 import tempfile
+import importlib.util
+import struct
+import shutil
+import hashlib
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+# Canales por tipo de color PNG (0 gris, 2 RGB, 3 paleta, 4 gris+alpha, 6 RGBA)
+PNG_CHANNELS = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}
+# Sufijos de escala que escribe create_scaled_variants: 'nombre@2x', 'nombre@0.5x'
+SCALE_SUFFIX = re.compile(r'(.+)@(\d+(?:\.\d+)?)x')
 
 class VerifiedAssetDownloader:
     def __init__(self, base_path: str):
         self.base_path = Path(base_path)
         self.assets_path = self.base_path / "assets_verified"
+        self.quarantine_path = self.assets_path / "_quarantine"
+        # Almacén direccionado por contenido: _objects/ab/cdef... (SHA-256 del archivo)
+        self.objects_path = self.assets_path / "_objects"
+        self.views_file = self.objects_path / "views.json"
+        
+        # Límites de verificación (protegen contra zip bombs y PNG malformados)
+        self.max_image_dimension = 8192
+        self.max_uncompressed_bytes = 256 * 1024 * 1024
+        self.max_compression_ratio = 200
         
         # URLs verificadas de OpenGameArt con nombres descriptivos
         self.verified_downloads = {
@@ -263,9 +285,10 @@ class VerifiedAssetDownloader:
                         urllib.request.urlretrieve(pack_info[url_key], target_file)
                         print(f"    ✅ {pack_name} descargado correctamente")
                         
-                        # Si es ZIP, extraer
+                        # Si es ZIP, extraer; un ZIP rechazado o fallido pasa a la siguiente URL
                         if pack_info['filename'].endswith('.zip'):
-                            self._extract_zip_with_structure(target_file, category_dir, pack_name)
+                            if not self._extract_zip_with_structure(target_file, category_dir, pack_name):
+                                continue
                         
                         downloaded_packs += 1
                         success = True
@@ -279,42 +302,144 @@ class VerifiedAssetDownloader:
         
         return downloaded_packs
     
-    def _extract_zip_with_structure(self, zip_file: Path, extract_dir: Path, pack_name: str):
-        """Extrae ZIP manteniendo estructura organizada."""
+    def _extract_zip_with_structure(self, zip_file: Path, extract_dir: Path, pack_name: str) -> bool:
+        """Extrae ZIP manteniendo estructura organizada; devuelve False si se rechaza o falla."""
         print(f"    📂 Extrayendo {pack_name}...")
         
+        # ZIPs truncados o que superan los límites se registran en cuarentena sin extraer nada
+        try:
+            with zipfile.ZipFile(zip_file, 'r') as zip_ref:
+                self._check_zip_limits(zip_ref)
+        except (zipfile.BadZipFile, ValueError) as e:
+            self._quarantine_files({zip_file: f"ZIP rechazado: {e}"})
+            return False
+        
         extracted_dir = extract_dir / f"{pack_name}_extracted"
         extracted_dir.mkdir(exist_ok=True)
         
+        views = self._load_views()
+        organized_count = 0
         try:
             with zipfile.ZipFile(zip_file, 'r') as zip_ref:
-                zip_ref.extractall(extracted_dir)
-            
-            # Organizar archivos PNG extraídos
-            png_files = list(extracted_dir.rglob("*.png"))
-            organized_count = 0
-            
-            for png_file in png_files:
-                # Determinar carpeta de destino basada en el nombre del archivo
-                filename = png_file.name.lower()
-                organized_path = self._categorize_png_by_name(filename)
-                
-                if organized_path:
-                    dest_dir = self.assets_path / organized_path
-                    dest_dir.mkdir(parents=True, exist_ok=True)
+                for info in zip_ref.infolist():
+                    if info.is_dir():
+                        continue
                     
-                    # Copiar con nombre descriptivo
-                    new_name = f"{pack_name}_{png_file.name}"
-                    dest_file = dest_dir / new_name
+                    # Sólo los PNG pasan al almacén; el resto se extrae tal cual
+                    member_name = Path(info.filename).name
+                    if not member_name.lower().endswith('.png'):
+                        zip_ref.extract(info, extracted_dir)
+                        continue
                     
-                    import shutil
-                    shutil.copy2(png_file, dest_file)
-                    organized_count += 1
+                    # Determinar carpeta de destino basada en el nombre del archivo
+                    organized_path = self._categorize_png_by_name(member_name.lower())
+                    if organized_path:
+                        digest = self._store_blob(zip_ref.read(info))
+                        
+                        # Vista con nombre descriptivo enlazada al blob
+                        relative = f"{organized_path}/{pack_name}_{member_name}"
+                        self._link_view(relative, digest)
+                        views[relative] = digest
+                        organized_count += 1
             
             print(f"    ✅ {organized_count} archivos PNG organizados")
+            return True
             
         except Exception as e:
             print(f"    ❌ Error extrayendo {pack_name}: {e}")
+            return False
+        finally:
+            # Aunque el ZIP falle a medias, las vistas ya enlazadas quedan registradas y el GC no borra sus blobs
+            if organized_count:
+                self._save_views(views)
+    
+    def _blob_path(self, digest: str) -> Path:
+        """Ruta del blob de un digest SHA-256, repartida en subcarpetas de dos caracteres."""
+        return self.objects_path / digest[:2] / digest[2:]
+    
+    def _store_blob(self, data: bytes) -> str:
+        """Guarda un blob una única vez en el almacén y devuelve su digest."""
+        digest = hashlib.sha256(data).hexdigest()
+        blob = self._blob_path(digest)
+        if not blob.exists():
+            blob.parent.mkdir(parents=True, exist_ok=True)
+            tmp = blob.with_name(f".{blob.name}.tmp")
+            tmp.write_bytes(data)
+            os.replace(tmp, blob)
+        return digest
+    
+    def _link_view(self, relative: str, digest: str):
+        """Enlaza assets_path/relative al blob; hard link y, si no es posible, symlink."""
+        dest = self.assets_path / relative
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        blob = self._blob_path(digest)
+        
+        # Se crea con nombre temporal y se renombra: la vista nunca queda a medias
+        tmp = dest.with_name(f".{dest.name}.tmp")
+        if tmp.exists() or tmp.is_symlink():
+            tmp.unlink()
+        try:
+            os.link(blob, tmp)
+        except OSError:
+            os.symlink(os.path.relpath(blob, tmp.parent), tmp)
+        os.replace(tmp, dest)
+    
+    def _load_views(self):
+        """Lee el mapa de vistas (ruta relativa -> digest)."""
+        if self.views_file.exists():
+            with open(self.views_file) as f:
+                return json.load(f)
+        return {}
+    
+    def _save_views(self, views):
+        """Guarda el mapa de vistas de forma atómica."""
+        self.objects_path.mkdir(parents=True, exist_ok=True)
+        tmp = self.views_file.with_name(f".{self.views_file.name}.tmp")
+        with open(tmp, 'w') as f:
+            json.dump(views, f, indent=2, sort_keys=True)
+        os.replace(tmp, self.views_file)
+    
+    def rebuild_views(self):
+        """Regenera las vistas por categoría que falten o no apunten a su blob."""
+        rebuilt = 0
+        for relative, digest in self._load_views().items():
+            dest = self.assets_path / relative
+            blob = self._blob_path(digest)
+            if not blob.exists():
+                continue
+            if dest.exists() and os.path.samefile(dest, blob):
+                continue
+            self._link_view(relative, digest)
+            rebuilt += 1
+        return rebuilt
+    
+    def collect_garbage(self):
+        """Elimina los blobs que ninguna vista referencia y devuelve los bytes liberados."""
+        print("\n🧹 Limpiando blobs sin referencias...")
+        
+        referenced = set(self._load_views().values())
+        freed = 0
+        removed = 0
+        for blob in self.objects_path.glob("??/*"):
+            if blob.name.startswith('.'):
+                continue
+            if blob.parent.name + blob.name not in referenced:
+                freed += blob.stat().st_size
+                blob.unlink()
+                removed += 1
+        
+        print(f"  ✅ {removed} blobs eliminados ({freed} bytes)")
+        return freed
+    
+    def _check_zip_limits(self, zip_ref: zipfile.ZipFile):
+        """Rechaza ZIPs cuyo tamaño descomprimido o ratio delatan una zip bomb."""
+        total_size = 0
+        for info in zip_ref.infolist():
+            total_size += info.file_size
+            if info.compress_size and info.file_size / info.compress_size > self.max_compression_ratio:
+                raise ValueError(f"ratio de compresión sospechoso en {info.filename}")
+        if total_size > self.max_uncompressed_bytes:
+            raise ValueError(f"contenido descomprimido demasiado grande ({total_size} bytes)")
     
     def _categorize_png_by_name(self, filename: str) -> str:
         """Categoriza PNG por nombre de archivo para organización."""
@@ -404,6 +529,125 @@ class VerifiedAssetDownloader:
             print("  ⚠️ PIL no disponible, creando placeholders de texto...")
             return self._create_text_placeholders()
     
+    def create_procedural_variants(self, count=16, seed=0):
+        """Genera N variantes con semilla por cada asset de terreno, agua o naturaleza en un atlas."""
+        print(f"\n🎲 Generando {count} variantes procedurales por asset...")
+        
+        try:
+            import numpy as np
+            from PIL import Image, ImageDraw
+        except ImportError:
+            print("  ⚠️ NumPy/PIL no disponibles, se omiten variantes procedurales")
+            return 0
+        
+        variants_dir = self.assets_path / "variants"
+        variants_dir.mkdir(parents=True, exist_ok=True)
+        
+        index = {}
+        created = 0
+        for asset_name, asset_info in self.fallback_assets.items():
+            if asset_info['type'] not in ('terrain', 'water', 'nature'):
+                continue
+            
+            w, h = asset_info['size']
+            colors = np.array(asset_info['colors'], dtype=np.float32)
+            rng = np.random.default_rng([seed, zlib.crc32(asset_name.encode())])
+            
+            # Todo el lote se calcula de una vez con forma (count, alto, ancho, canales)
+            if asset_info['type'] == 'terrain':
+                batch = self._render_terrain_variants(np, rng, count, w, h, colors)
+            elif asset_info['type'] == 'water':
+                batch = self._render_water_variants(np, rng, count, w, h, colors)
+            else:
+                # Naturaleza sobre fondo transparente: el alfa de la forma se conserva en el atlas
+                base = Image.new('RGBA', (w, h), (0, 0, 0, 0))
+                self._draw_nature_details(ImageDraw.Draw(base), (w, h), asset_name, asset_info['colors'])
+                batch = self._render_nature_variants(np, rng, count, np.asarray(base, dtype=np.float32))
+            
+            # Atlas en rejilla casi cuadrada: variante i en (i % columnas, i // columnas)
+            channels = batch.shape[-1]
+            mode = 'RGBA' if channels == 4 else 'RGB'
+            columns = int(np.ceil(np.sqrt(count)))
+            rows = int(np.ceil(count / columns))
+            grid = np.zeros((rows * columns, h, w, channels), dtype=np.uint8)
+            grid[:count] = batch
+            atlas = grid.reshape(rows, columns, h, w, channels).transpose(0, 2, 1, 3, 4).reshape(rows * h, columns * w, channels)
+            
+            atlas_file = variants_dir / f"{asset_name}_variants.png"
+            Image.fromarray(atlas, mode).save(atlas_file)
+            index[asset_name] = {
+                'file': str(atlas_file.relative_to(self.assets_path)),
+                'mode': mode,
+                'frame': [w, h],
+                'columns': columns,
+                'count': count,
+                'seed': seed,
+                'category': asset_info['category']
+            }
+            created += count
+        
+        with open(variants_dir / "variant_index.json", 'w') as f:
+            json.dump(index, f, indent=2)
+        
+        print(f"  ✅ {created} variantes en {len(index)} atlas")
+        return created
+    
+    def _tileable_noise(self, np, rng, count, w, h, cells):
+        """Ruido de valor periódico (count, alto, ancho) en [0, 1) para que los tiles encajen."""
+        lattice = rng.random((count, cells, cells), dtype=np.float32)
+        
+        def axis(size):
+            pos = np.arange(size, dtype=np.float32) * cells / size
+            i0 = pos.astype(np.int64)
+            t = pos - i0
+            return i0, (i0 + 1) % cells, t * t * (3 - 2 * t)
+        
+        y0, y1, ty = axis(h)
+        x0, x1, tx = axis(w)
+        ty = ty[None, :, None]
+        tx = tx[None, None, :]
+        
+        top = lattice[:, y0][:, :, x0] * (1 - tx) + lattice[:, y0][:, :, x1] * tx
+        bottom = lattice[:, y1][:, :, x0] * (1 - tx) + lattice[:, y1][:, :, x1] * tx
+        return top * (1 - ty) + bottom * ty
+    
+    def _render_terrain_variants(self, np, rng, count, w, h, colors):
+        """Terreno: ruido a dos escalas que mezcla los tres colores de la paleta."""
+        noise = 0.7 * self._tileable_noise(np, rng, count, w, h, 4) + 0.3 * self._tileable_noise(np, rng, count, w, h, 8)
+        
+        # Umbrales: color base dominante, manchas del segundo y detalles del tercero
+        layer = np.digitize(noise, [0.55, 0.7])
+        pixels = colors[layer]
+        pixels *= (0.9 + 0.2 * noise)[..., None]
+        return np.clip(pixels, 0, 255).astype(np.uint8)
+    
+    def _render_water_variants(self, np, rng, count, w, h, colors):
+        """Agua: ondas sinusoidales con fase y frecuencia por variante más ruido periódico."""
+        y = np.arange(h, dtype=np.float32)[None, :, None]
+        x = np.arange(w, dtype=np.float32)[None, None, :]
+        phase = rng.random((count, 1, 1), dtype=np.float32) * 2 * np.pi
+        waves = rng.integers(1, 4, (count, 1, 1))
+        
+        # Frecuencias enteras por tile para que las ondas sigan siendo periódicas
+        ripple = np.sin(2 * np.pi * (waves * x / w + 2 * y / h) + phase) * 0.5 + 0.5
+        mix = 0.6 * ripple + 0.4 * self._tileable_noise(np, rng, count, w, h, 4)
+        
+        pixels = colors[0] + (colors[1] - colors[0]) * mix[..., None]
+        crests = mix > 0.85
+        pixels[crests] = colors[2]
+        return np.clip(pixels, 0, 255).astype(np.uint8)
+    
+    def _render_nature_variants(self, np, rng, count, base):
+        """Naturaleza: la forma RGBA dibujada con PIL con brillo y moteado distintos por variante."""
+        shape = base[..., 3:4] > 0
+        tint = rng.uniform(0.85, 1.15, (count, 1, 1, 3)).astype(np.float32)
+        speckle = rng.uniform(-18, 18, (count,) + base.shape[:2] + (1,)).astype(np.float32)
+        
+        # Sólo se alteran los píxeles de la forma; fuera de ella el color y el alfa siguen a 0
+        rgb = (base[None, ..., :3] * tint + speckle) * shape[None]
+        alpha = np.broadcast_to(base[None, ..., 3:4], rgb.shape[:3] + (1,))
+        return np.clip(np.concatenate([rgb, alpha], axis=-1), 0, 255).astype(np.uint8)
+    
     def _draw_building_details(self, draw, size, name, colors):
         """Dibuja detalles específicos de edificios."""
         w, h = size
@@ -629,7 +873,182 @@ class VerifiedAssetDownloader:
             created += 1
         
         return created
+
+    def verify_ingested_assets(self, full_decode=False, workers=None):
+        """Verifica en paralelo todos los PNG ingeridos y pone en cuarentena los corruptos."""
+        print("\n🔒 Verificando integridad de assets...")
+        
+        png_files = [
+            png_file for png_file in self.assets_path.rglob("*.png")
+            if self.quarantine_path not in png_file.parents
+        ]
+        
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(lambda f: self._verify_png_file(f, full_decode), png_files))
+        
+        failures = {png_file: error for png_file, error in zip(png_files, results) if error is not None}
+        self._quarantine_files(failures)
+        
+        print(f"  ✅ {len(png_files) - len(failures)} PNG válidos, {len(failures)} en cuarentena")
+        return len(failures)
     
+    def _quarantine_files(self, failures):
+        """Mueve los archivos fallidos a _quarantine y registra su motivo en quarantine.json."""
+        if not failures:
+            return
+        
+        report = self._load_quarantine_report()
+        views = self._load_views()
+        for failed_file, error in failures.items():
+            relative = failed_file.relative_to(self.assets_path)
+            target = self.quarantine_path / relative
+            target.parent.mkdir(parents=True, exist_ok=True)
+            if failed_file.is_symlink() and failed_file.exists():
+                # Un symlink apunta a un blob que el GC borrará: se guarda una copia real
+                shutil.copyfile(failed_file, target)
+                failed_file.unlink()
+            else:
+                shutil.move(str(failed_file), str(target))
+            report[relative.as_posix()] = error
+            views.pop(relative.as_posix(), None)
+            print(f"  ❌ {relative}: {error}")
+        
+        # Las vistas en cuarentena dejan de reconstruirse y su blob queda para el GC
+        if self.views_file.exists():
+            self._save_views(views)
+        with open(self.quarantine_path / "quarantine.json", 'w') as f:
+            json.dump(report, f, indent=2)
+    
+    def _load_variant_index(self):
+        """Lee el índice de atlas de variantes procedurales si existe."""
+        index_file = self.assets_path / "variants" / "variant_index.json"
+        if index_file.exists():
+            with open(index_file) as f:
+                return json.load(f)
+        return {}
+    
+    def _load_quarantine_report(self):
+        """Lee el registro de cuarentena existente (archivo -> motivo)."""
+        report_file = self.quarantine_path / "quarantine.json"
+        if report_file.exists():
+            with open(report_file) as f:
+                return json.load(f)
+        return {}
+    
+    def _verify_png_file(self, png_file: Path, full_decode=False):
+        """Valida firma, CRC de chunks e IHDR de un PNG; devuelve el motivo del fallo o None."""
+        try:
+            data = png_file.read_bytes()
+        except OSError as e:
+            return f"no legible: {e}"
+        
+        if not data.startswith(PNG_SIGNATURE):
+            return "firma PNG inválida"
+        
+        pos = len(PNG_SIGNATURE)
+        header = None
+        idat = []
+        while True:
+            if pos + 8 > len(data):
+                return "archivo truncado (falta IEND)"
+            length, chunk_type = struct.unpack_from('>I4s', data, pos)
+            end = pos + 12 + length
+            if end > len(data):
+                return f"chunk {chunk_type!r} truncado"
+            
+            chunk_data = data[pos + 8:pos + 8 + length]
+            (crc,) = struct.unpack_from('>I', data, end - 4)
+            if zlib.crc32(chunk_type + chunk_data) != crc:
+                return f"CRC incorrecto en chunk {chunk_type!r}"
+            
+            if header is None:
+                if chunk_type != b'IHDR' or length != 13:
+                    return "IHDR ausente o malformado"
+                header = struct.unpack('>IIBBBBB', chunk_data)
+            elif chunk_type == b'IDAT':
+                idat.append(chunk_data)
+            elif chunk_type == b'IEND':
+                break
+            pos = end
+        
+        width, height, bit_depth, color_type, _, _, interlace = header
+        if color_type not in PNG_CHANNELS:
+            return f"tipo de color desconocido ({color_type})"
+        if not (0 < width <= self.max_image_dimension and 0 < height <= self.max_image_dimension):
+            return f"dimensiones fuera de rango ({width}x{height})"
+        if not idat:
+            return "sin datos de imagen (IDAT)"
+        
+        expected = self._png_raw_size(width, height, PNG_CHANNELS[color_type] * bit_depth, interlace)
+        if expected > self.max_uncompressed_bytes:
+            return f"tamaño descomprimido excesivo ({expected} bytes)"
+        
+        if full_decode:
+            # Descompresión acotada: nunca se inflan más bytes de los esperados
+            decompressor = zlib.decompressobj()
+            try:
+                raw = decompressor.decompress(b''.join(idat), expected + 1)
+            except zlib.error as e:
+                return f"IDAT corrupto: {e}"
+            if not decompressor.eof or len(raw) > expected:
+                return "IDAT con datos sobrantes o incompletos"
+            if len(raw) != expected:
+                return f"IDAT de tamaño inesperado ({len(raw)} != {expected})"
+        
+        return None
+    
+    def _png_raw_size(self, width, height, bits_per_pixel, interlace):
+        """Bytes descomprimidos de IDAT: un byte de filtro por fila más los píxeles de cada pasada."""
+        if interlace == 0:
+            passes = [(0, 0, 1, 1)]
+        else:
+            # Pasadas Adam7 (x inicial, y inicial, paso x, paso y); las vacías no tienen filas
+            passes = [(0, 0, 8, 8), (4, 0, 8, 8), (0, 4, 4, 8), (2, 0, 4, 4),
+                      (0, 2, 2, 4), (1, 0, 2, 2), (0, 1, 1, 2)]
+        
+        total = 0
+        for x0, y0, dx, dy in passes:
+            pass_width = (width - x0 + dx - 1) // dx
+            pass_height = (height - y0 + dy - 1) // dy
+            if pass_width > 0 and pass_height > 0:
+                total += pass_height * ((pass_width * bits_per_pixel + 7) // 8 + 1)
+        return total
+    
+    def create_scaled_variants(self, scales=(2, 3, 4), min_mip_size=4):
+        """Genera variantes HiDPI (nearest-neighbor) y cadena de mips de los assets de respaldo."""
+        print("\n🔍 Generando variantes escaladas para HiDPI...")
+        
+        # Se reutiliza el escalado de scripts/extract-furniture.py para no duplicarlo
+        script = Path(__file__).resolve().parent.parent / "scripts" / "extract-furniture.py"
+        try:
+            spec = importlib.util.spec_from_file_location("extract_furniture", script)
+            extract_furniture = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(extract_furniture)
+            from PIL import Image
+        except (ImportError, OSError):
+            print("  ⚠️ NumPy/PIL o scripts/extract-furniture.py no disponibles, se omiten variantes escaladas")
+            return 0
+        
+        created = 0
+        # Sólo los sprites generados aquí: los packs descargados y los atlas no se escalan
+        for asset_name, asset_info in self.fallback_assets.items():
+            png_file = self.assets_path / asset_info['category'] / f"{asset_name}.png"
+            if not png_file.exists():
+                continue
+            
+            with Image.open(png_file) as img:
+                created += len(extract_furniture.save_scaled_variants(img, str(png_file), scales, min_mip_size))
+        
+        print(f"  ✅ {created} variantes escaladas creadas")
+        return created
+    
+    def _split_variant_name(self, png_file: Path):
+        """Separa 'nombre@2x' o 'nombre@0.5x' en ('nombre', '2x'); devuelve None si no es variante."""
+        match = SCALE_SUFFIX.fullmatch(png_file.stem)
+        if match is None:
+            return None
+        return match.group(1), f"{match.group(2)}x"
+
     def create_asset_catalog(self):
         """Crea un catálogo detallado de todos los assets."""
         print("\n📋 Creando catálogo detallado de assets...")
@@ -639,6 +1058,9 @@ class VerifiedAssetDownloader:
             'generator': 'verified_asset_downloader',
             'naming_convention': 'descriptive_names_for_easy_usage',
             'categories': {},
+            'variants': {},
+            'procedural_variants': self._load_variant_index(),
+            'quarantine': self._load_quarantine_report(),
             'total_files': 0,
             'usage_guide': {
                 'buildings': 'Use for city/town construction in your 2D world',
@@ -660,9 +1082,18 @@ class VerifiedAssetDownloader:
         
         # Analizar archivos existentes
         for category_dir in self.assets_path.iterdir():
-            if category_dir.is_dir():
+            if category_dir.is_dir() and category_dir not in (self.quarantine_path, self.objects_path):
                 category_name = str(category_dir.relative_to(self.assets_path))
-                png_files = list(category_dir.rglob("*.png"))
+                png_files = []
+                for png_file in category_dir.rglob("*.png"):
+                    variant = self._split_variant_name(png_file)
+                    if variant is None:
+                        png_files.append(png_file)
+                        continue
+                    # Las variantes se indexan aparte para que el cliente elija por devicePixelRatio
+                    base, suffix = variant
+                    base_key = str((png_file.parent / f"{base}.png").relative_to(self.assets_path))
+                    catalog['variants'].setdefault(base_key, {})[suffix] = str(png_file.relative_to(self.assets_path))
                 txt_files = list(category_dir.rglob("*.txt"))
                 
                 catalog['categories'][category_name] = {
@@ -749,7 +1180,7 @@ Todos los assets usan nombres que describen exactamente qué contienen:
         
         return readme
     
-    def run_verified_download(self):
+    def run_verified_download(self, full_decode=False):
         """Ejecuta el proceso completo de descarga verificada."""
         print("✅ DESCARGADOR DE ASSETS VERIFICADOS")
         print("=" * 50)
@@ -765,7 +1196,20 @@ Todos los assets usan nombres que describen exactamente qué contienen:
         # Paso 3: Assets descriptivos de respaldo
         created = self.create_descriptive_fallbacks()
         
-        # Paso 4: Catálogo
+        # Paso 3b: Variantes procedurales de terreno, agua y naturaleza
+        variants = self.create_procedural_variants()
+        
+        # Paso 4: Verificación de integridad
+        quarantined = self.verify_ingested_assets(full_decode=full_decode)
+        
+        # Paso 4b: Vistas del almacén de objetos y limpieza de blobs huérfanos
+        self.rebuild_views()
+        self.collect_garbage()
+        
+        # Paso 5: Variantes HiDPI y mips
+        scaled = self.create_scaled_variants()
+        
+        # Paso 6: Catálogo
         catalog = self.create_asset_catalog()
         
         # Reporte final
@@ -773,6 +1217,9 @@ Todos los assets usan nombres que describen exactamente qué contienen:
         print("=" * 25)
         print(f"📦 Packs descargados: {downloaded}")
         print(f"🎨 Assets creados: {created}")
+        print(f"🎲 Variantes procedurales: {variants}")
+        print(f"🔒 En cuarentena: {quarantined}")
+        print(f"🔍 Variantes escaladas: {scaled}")
         print(f"📁 Total de archivos: {catalog['total_files']}")
         
         print(f"\n📂 CATEGORÍAS ORGANIZADAS:")
@@ -790,11 +1237,13 @@ def main():
     
     parser = argparse.ArgumentParser(description="Descargador de assets verificados con nombres descriptivos")
     parser.add_argument("--path", default=".", help="Ruta base del proyecto")
+    parser.add_argument("--full-decode", action="store_true",
+                        help="Descomprimir por completo cada PNG durante la verificación")
     
     args = parser.parse_args()
     
     downloader = VerifiedAssetDownloader(args.path)
-    downloader.run_verified_download()
+    downloader.run_verified_download(full_decode=args.full_decode)
 
 
 if __name__ == "__main__":
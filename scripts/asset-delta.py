@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Script para generar parches delta entre dos snapshots de assets
+"""
+
+import os
+import sys
+import hashlib
+import io
+import json
+import numpy as np
+from PIL import Image
+
+# Modos en los que pegar una región reproduce exactamente los píxeles (P con la misma paleta)
+PATCHABLE_MODES = ('RGBA', 'RGB', 'P')
+
+def list_files(snapshot_dir):
+    """Listar archivos de un snapshot como rutas relativas"""
+    files = {}
+    for root, _, names in os.walk(snapshot_dir):
+        for name in names:
+            path = os.path.join(root, name)
+            files[os.path.relpath(path, snapshot_dir).replace(os.sep, '/')] = path
+    return files
+
+def file_sha256(path):
+    """Hash SHA-256 de un archivo"""
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def pixels_sha256(img):
+    """Hash SHA-256 de los píxeles RGBA decodificados (independiente del codificador PNG)"""
+    return hashlib.sha256(np.ascontiguousarray(np.asarray(img.convert('RGBA'))).tobytes()).hexdigest()
+
+def can_patch_in_place(old_img, new_img):
+    """Un PNG se parchea por regiones sólo si el modo y tamaño se conservan (y la paleta, si es P)"""
+    if old_img.mode != new_img.mode or old_img.size != new_img.size:
+        return False
+    if new_img.mode not in PATCHABLE_MODES:
+        return False
+    if new_img.mode == 'P':
+        return (old_img.getpalette() == new_img.getpalette()
+                and old_img.info.get('transparency') == new_img.info.get('transparency'))
+    return True
+
+def dirty_rectangles(previous, current, block_size=16):
+    """Rectángulos [x, y, ancho, alto] que cubren los bloques con píxeles distintos"""
+    height, width = current.shape[:2]
+    changed = (previous != current).any(axis=-1)
+
+    # Rellenar hasta múltiplo del bloque y reducir cada bloque a un único booleano
+    pad_h = -height % block_size
+    pad_w = -width % block_size
+    changed = np.pad(changed, ((0, pad_h), (0, pad_w)))
+    blocks = changed.reshape(changed.shape[0] // block_size, block_size,
+                             changed.shape[1] // block_size, block_size).any(axis=(1, 3))
+
+    # Tramos horizontales de bloques sucios por fila
+    runs = []
+    for by, row in enumerate(blocks):
+        padded = np.concatenate([[False], row, [False]])
+        edges = np.flatnonzero(padded[1:] != padded[:-1])
+        runs.extend((by, int(start), int(end)) for start, end in zip(edges[::2], edges[1::2]))
+
+    # Fusionar verticalmente tramos idénticos en filas consecutivas
+    merged = []
+    open_runs = {}
+    for by, start, end in runs:
+        rect = open_runs.get((start, end))
+        if rect is not None and rect[1] + rect[3] == by:
+            rect[3] += 1
+        else:
+            rect = [start, by, end - start, 1]
+            open_runs[(start, end)] = rect
+            merged.append(rect)
+
+    rects = []
+    for bx, by, bw, bh in merged:
+        x, y = bx * block_size, by * block_size
+        rects.append([x, y, min(bw * block_size, width - x), min(bh * block_size, height - y)])
+    return rects
+
+def encode_png(img):
+    """Codificar una imagen como PNG en memoria conservando su modo"""
+    buffer = io.BytesIO()
+    img.save(buffer, format='PNG', optimize=True)
+    return buffer.getvalue()
+
+def build_patch(previous_dir, current_dir, patch_dir, block_size=16):
+    """Comparar dos snapshots y escribir el manifiesto de parche con sus regiones
+
+    'added' y 'replaced' se descargan enteros y su 'sha256' es el del archivo. Las entradas
+    'patched' se reconstruyen pegando regiones, así que el archivo resultante no tiene por qué
+    coincidir byte a byte: se verifican con 'pixels_sha256', el SHA-256 de los píxeles RGBA
+    decodificados. 'from' es el hash del archivo anterior sobre el que se aplica el parche.
+    """
+    previous_files = list_files(previous_dir)
+    current_files = list_files(current_dir)
+    os.makedirs(patch_dir, exist_ok=True)
+
+    manifest = {
+        'version': 1,
+        'block_size': block_size,
+        'added': {},
+        'removed': sorted(set(previous_files) - set(current_files)),
+        'replaced': {},
+        'patched': {}
+    }
+    full_bytes = 0
+    patch_bytes = 0
+
+    for relative, current_path in sorted(current_files.items()):
+        current_hash = file_sha256(current_path)
+        size = os.path.getsize(current_path)
+        previous_path = previous_files.get(relative)
+
+        if previous_path is None:
+            manifest['added'][relative] = {'sha256': current_hash, 'bytes': size}
+            full_bytes += size
+            patch_bytes += size
+            continue
+
+        previous_hash = file_sha256(previous_path)
+        if previous_hash == current_hash:
+            continue
+
+        full_bytes += size
+        regions = None
+
+        if relative.endswith('.png'):
+            with Image.open(previous_path) as old_img, Image.open(current_path) as new_img:
+                if can_patch_in_place(old_img, new_img):
+                    old_pixels = np.asarray(old_img.convert('RGBA'))
+                    new_pixels = np.asarray(new_img.convert('RGBA'))
+                    mode = new_img.mode
+                    pixel_hash = pixels_sha256(new_img)
+
+                    # Las regiones se recortan de la imagen original: conservan modo y paleta
+                    regions = []
+                    region_bytes = 0
+                    for index, (x, y, w, h) in enumerate(dirty_rectangles(old_pixels, new_pixels, block_size)):
+                        data = encode_png(new_img.crop((x, y, x + w, y + h)))
+                        region_file = f"{relative}.{index}.png"
+                        regions.append({'rect': [x, y, w, h], 'file': region_file, 'data': data})
+                        region_bytes += len(data)
+
+                    # Si las regiones pesan más que el archivo completo, no compensa
+                    if region_bytes >= size:
+                        regions = None
+
+        if regions is None:
+            manifest['replaced'][relative] = {'from': previous_hash, 'sha256': current_hash, 'bytes': size}
+            patch_bytes += size
+            continue
+
+        entry = {'from': previous_hash, 'mode': mode, 'pixels_sha256': pixel_hash, 'regions': []}
+        for region in regions:
+            region_path = os.path.join(patch_dir, region['file'])
+            os.makedirs(os.path.dirname(region_path), exist_ok=True)
+            with open(region_path, 'wb') as f:
+                f.write(region['data'])
+            entry['regions'].append({'rect': region['rect'], 'file': region['file']})
+            patch_bytes += len(region['data'])
+        manifest['patched'][relative] = entry
+
+    manifest['report'] = {
+        'full_download_bytes': full_bytes,
+        'patch_bytes': patch_bytes,
+        'saved_bytes': full_bytes - patch_bytes
+    }
+
+    with open(os.path.join(patch_dir, "patch-manifest.json"), 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+    print(f"Añadidos: {len(manifest['added'])} | eliminados: {len(manifest['removed'])} | "
+          f"reemplazados: {len(manifest['replaced'])} | parcheados: {len(manifest['patched'])}")
+    print(f"Descarga completa: {full_bytes} bytes | parche: {patch_bytes} bytes")
+    return manifest
+
+def apply_patch(previous_dir, patch_dir, output_dir, current_dir=None):
+    """Reconstruir un snapshot aplicando el parche sobre el anterior (para verificación)"""
+    with open(os.path.join(patch_dir, "patch-manifest.json")) as f:
+        manifest = json.load(f)
+
+    for relative, path in list_files(previous_dir).items():
+        if relative in manifest['removed']:
+            continue
+        target = os.path.join(output_dir, relative)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+
+        entry = manifest['patched'].get(relative)
+        if entry is None:
+            with open(path, 'rb') as src, open(target, 'wb') as dst:
+                dst.write(src.read())
+            continue
+
+        # Pegar en el modo original: en P se copian índices sobre la misma paleta
+        with Image.open(path) as img:
+            rebuilt = img.copy()
+        for region in entry['regions']:
+            x, y = region['rect'][:2]
+            with Image.open(os.path.join(patch_dir, region['file'])) as patch:
+                rebuilt.paste(patch, (x, y))
+
+        if pixels_sha256(rebuilt) != entry['pixels_sha256']:
+            raise ValueError(f"El parche de {relative} no reproduce los píxeles esperados")
+        rebuilt.save(target)
+
+    # Los archivos añadidos o reemplazados se copian enteros desde el snapshot nuevo
+    if current_dir:
+        for relative in list(manifest['added']) + list(manifest['replaced']):
+            target = os.path.join(output_dir, relative)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            with open(os.path.join(current_dir, relative), 'rb') as src, open(target, 'wb') as dst:
+                dst.write(src.read())
+
+def main():
+    """Función principal"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Genera parches delta entre dos snapshots de assets")
+    parser.add_argument("previous", help="Directorio del snapshot anterior")
+    parser.add_argument("current", help="Directorio del snapshot actual")
+    parser.add_argument("patch", help="Directorio de salida del parche")
+    parser.add_argument("--block-size", type=int, default=16, help="Tamaño de bloque para regiones sucias")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.previous) or not os.path.isdir(args.current):
+        print("Los snapshots deben ser directorios existentes")
+        sys.exit(1)
+
+    build_patch(args.previous, args.current, args.patch, args.block_size)
+
+if __name__ == "__main__":
+    main()
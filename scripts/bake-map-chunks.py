@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Script para hornear chunks de mapa prerenderizados a partir de un layout de tiles
+"""
+
+import os
+import sys
+import json
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from PIL import Image
+
+# Layout de mapa (JSON):
+#   {
+#     "tile_size": 16, "width": 64, "height": 48,
+#     "palette": ["terrain/base/cesped1", "water/Water_Middle", ...],
+#     "layers": [[[índice de paleta o -1, ...], ...], ...]   # capas de abajo arriba
+#   }
+
+_tile_stack = None
+
+def _load_tile_stack(assets_dir, palette, tile_size):
+    """Cargar los tiles de la paleta como array (tiles + 1, tamaño, tamaño, 4); el último es vacío"""
+    global _tile_stack
+    stack = np.zeros((len(palette) + 1, tile_size, tile_size, 4), dtype=np.float32)
+    for index, name in enumerate(palette):
+        with Image.open(os.path.join(assets_dir, f"{name}.png")) as img:
+            tile = img.convert('RGBA').crop((0, 0, tile_size, tile_size))
+            stack[index] = np.asarray(tile, dtype=np.float32) / 255
+    _tile_stack = stack
+
+def composite_chunk(layers):
+    """Componer las capas de un chunk (capas, filas, columnas) con alpha-over"""
+    rows, cols = layers.shape[1:]
+    tile_size = _tile_stack.shape[1]
+    result = np.zeros((rows * tile_size, cols * tile_size, 4), dtype=np.float32)
+
+    for layer in layers:
+        # Los índices -1 apuntan al tile transparente del final de la pila
+        tiles = _tile_stack[layer]
+        pixels = tiles.transpose(0, 2, 1, 3, 4).reshape(rows * tile_size, cols * tile_size, 4)
+        alpha = pixels[..., 3:4]
+        # El RGB acumulado está premultiplicado por el alfa acumulado
+        result[..., :3] = pixels[..., :3] * alpha + result[..., :3] * (1 - alpha)
+        result[..., 3:4] = alpha + result[..., 3:4] * (1 - alpha)
+
+    # Deshacer la premultiplicación para guardar RGBA directo; alfa 0 queda negro transparente
+    coverage = result[..., 3:4]
+    np.divide(result[..., :3], coverage, out=result[..., :3], where=coverage > 0)
+    return np.rint(np.clip(result, 0, 1) * 255).astype(np.uint8)
+
+def _bake_chunk(job):
+    """Tarea del pool: componer y guardar un chunk"""
+    chunk_x, chunk_y, layers, output_path = job
+    pixels = composite_chunk(layers)
+    if not pixels[..., 3].any():
+        return chunk_x, chunk_y, None
+    Image.fromarray(pixels, 'RGBA').save(output_path)
+    return chunk_x, chunk_y, os.path.basename(output_path)
+
+def generate_layout(seed, width, height, tile_size=16):
+    """Generar un layout simple a partir de una semilla: césped, lagos y un cruce de caminos
+
+    Es un generador independiente para pruebas de horneado, no una réplica de
+    src/utils/mapGeneration.ts: el mapa del juego debe pasarse con --layout.
+    """
+    rng = np.random.default_rng(seed)
+    grass = [f"terrain/base/cesped{i}" for i in range(1, 32)]
+    palette = grass + ["water/Water_Middle", "roads/road_path_straight_h",
+                       "roads/road_path_straight_v", "roads/road_path_cross"]
+    water, road_h, road_v, road_cross = range(len(grass), len(palette))
+
+    base = rng.integers(0, len(grass), (height, width))
+
+    # Lagos: ruido de valor grueso interpolado al tamaño del mapa
+    coarse = rng.random((height // 8 + 2, width // 8 + 2))
+    ys = np.linspace(0, coarse.shape[0] - 1.001, height)
+    xs = np.linspace(0, coarse.shape[1] - 1.001, width)
+    y0, x0 = ys.astype(int), xs.astype(int)
+    ty, tx = (ys - y0)[:, None], (xs - x0)[None, :]
+    noise = (coarse[y0][:, x0] * (1 - tx) + coarse[y0][:, x0 + 1] * tx) * (1 - ty) + \
+            (coarse[y0 + 1][:, x0] * (1 - tx) + coarse[y0 + 1][:, x0 + 1] * tx) * ty
+    base[noise < 0.3] = water
+
+    roads = np.full((height, width), -1)
+    road_row = int(rng.integers(height // 4, 3 * height // 4))
+    road_col = int(rng.integers(width // 4, 3 * width // 4))
+    roads[road_row, :] = road_h
+    roads[:, road_col] = road_v
+    roads[road_row, road_col] = road_cross
+
+    return {
+        'tile_size': tile_size,
+        'width': width,
+        'height': height,
+        'palette': palette,
+        'layers': [base.tolist(), roads.tolist()]
+    }
+
+def bake_chunks(layout, assets_dir, output_dir, chunk_tiles=16, workers=None):
+    """Hornear el layout en chunks de chunk_tiles x chunk_tiles tiles usando un pool de procesos"""
+    os.makedirs(output_dir, exist_ok=True)
+    tile_size = layout['tile_size']
+    layers = np.array(layout['layers'], dtype=np.int64)
+    layers[layers < 0] = len(layout['palette'])
+
+    # Rellenar hasta múltiplo del chunk con el tile vacío
+    pad_y = -layout['height'] % chunk_tiles
+    pad_x = -layout['width'] % chunk_tiles
+    layers = np.pad(layers, ((0, 0), (0, pad_y), (0, pad_x)), constant_values=len(layout['palette']))
+
+    jobs = []
+    for chunk_y in range(layers.shape[1] // chunk_tiles):
+        for chunk_x in range(layers.shape[2] // chunk_tiles):
+            window = layers[:, chunk_y * chunk_tiles:(chunk_y + 1) * chunk_tiles,
+                            chunk_x * chunk_tiles:(chunk_x + 1) * chunk_tiles]
+            output_path = os.path.join(output_dir, f"chunk_{chunk_x}_{chunk_y}.png")
+            jobs.append((chunk_x, chunk_y, window, output_path))
+
+    # Cada proceso carga la pila de tiles una sola vez en su inicializador
+    with ProcessPoolExecutor(max_workers=workers, initializer=_load_tile_stack,
+                             initargs=(assets_dir, layout['palette'], tile_size)) as executor:
+        results = list(executor.map(_bake_chunk, jobs, chunksize=4))
+
+    index = {
+        'tile_size': tile_size,
+        'chunk_tiles': chunk_tiles,
+        'chunk_pixels': chunk_tiles * tile_size,
+        'width': layout['width'],
+        'height': layout['height'],
+        'chunks': [
+            {'x': chunk_x, 'y': chunk_y, 'file': filename}
+            for chunk_x, chunk_y, filename in results if filename
+        ]
+    }
+    with open(os.path.join(output_dir, "chunk-index.json"), 'w') as f:
+        json.dump(index, f, indent=2)
+
+    print(f"Horneados {len(index['chunks'])} chunks de {chunk_tiles}x{chunk_tiles} tiles en {output_dir}")
+    return index
+
+def main():
+    """Función principal"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Hornea chunks de mapa prerenderizados")
+    parser.add_argument("output", help="Directorio de salida de los chunks")
+    parser.add_argument("--assets", default="public/assets", help="Directorio public/assets del proyecto")
+    parser.add_argument("--layout", help="Layout JSON con paleta y capas de tiles")
+    parser.add_argument("--seed", type=int, help="Generar un layout de prueba a partir de una semilla "
+                             "(generador propio, no el de mapGeneration.ts)")
+    parser.add_argument("--size", type=int, nargs=2, default=(64, 48), metavar=("ANCHO", "ALTO"),
+                        help="Tamaño en tiles del mapa generado por semilla")
+    parser.add_argument("--chunk-tiles", type=int, default=16, help="Tiles por lado de cada chunk")
+    parser.add_argument("--workers", type=int, help="Procesos del pool (por defecto, uno por CPU)")
+    args = parser.parse_args()
+
+    if args.layout:
+        with open(args.layout) as f:
+            layout = json.load(f)
+    elif args.seed is not None:
+        layout = generate_layout(args.seed, *args.size)
+    else:
+        print("Indica --layout o --seed")
+        sys.exit(1)
+
+    bake_chunks(layout, args.assets, args.output, args.chunk_tiles, args.workers)
+
+if __name__ == "__main__":
+    main()
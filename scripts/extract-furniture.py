@@ -5,10 +5,21 @@ Script para extraer muebles individuales de spritesheets y generar tiles usables
 
 import os
 import sys
+import base64
+import glob
+import json
+import struct
+import time
+import zlib
+import numpy as np
 from PIL import Image
 
-def extract_furniture_tiles(spritesheet_path, output_dir, tile_size=32):
-    """Extraer tiles individuales de un spritesheet de muebles"""
+def extract_furniture_tiles(spritesheet_path, output_dir, tile_size=32, scales=(2, 3, 4), collision=True,
+                            pitches=None):
+    """Extraer tiles individuales de un spritesheet de muebles (pitches: varios tamaños (ancho, alto))
+    
+    Devuelve el rectángulo [x, y, ancho, alto] de cada tile guardado dentro del spritesheet.
+    """
     
     # Cargar la imagen
     try:
@@ -16,18 +27,37 @@ def extract_furniture_tiles(spritesheet_path, output_dir, tile_size=32):
         print(f"Cargando spritesheet: {spritesheet_path} ({img.size})")
     except Exception as e:
         print(f"Error cargando imagen: {e}")
-        return
+        return {}
     
     # Crear directorio de salida
     os.makedirs(output_dir, exist_ok=True)
     
-    # Calcular número de tiles
-    cols = img.width // tile_size
-    rows = img.height // tile_size
-    
-    print(f"Extrayendo {cols}x{rows} tiles de {tile_size}x{tile_size} píxeles")
+    if pitches:
+        # Varios tamaños de rejilla: se elige el mejor por región con una sola tabla de áreas
+        cells = plan_slices(img, pitches)
+        sizes = sorted({(w, h) for _, _, w, h in cells})
+        print(f"Extrayendo {len(cells)} tiles de tamaños {', '.join(f'{w}x{h}' for w, h in sizes)}")
+        
+        # Las celdas del borde pueden salirse de la imagen: se rellenan con transparencia
+        if cells:
+            sheet = pad_to_size(img.convert('RGBA'), max(x + w for x, _, w, _ in cells),
+                                max(y + h for _, y, _, h in cells))
+            tiles = (([x, y, w, h], sheet.crop((x, y, x + w, y + h))) for x, y, w, h in cells)
+        else:
+            tiles = iter(())
+    else:
+        # Calcular número de tiles
+        cols = img.width // tile_size
+        rows = img.height // tile_size
+        
+        print(f"Extrayendo {cols}x{rows} tiles de {tile_size}x{tile_size} píxeles")
+        tiles = (([col * tile_size, row * tile_size, tile_size, tile_size], tile)
+                 for row, col, tile in slice_tiles(img, tile_size) if not is_tile_empty(tile))
     
     tile_count = 0
+    sprites = {}
+    rects = {}
+    variants = {}
     furniture_names = [
         "table_round", "chair_wood", "sofa_brown", "bed_double", 
         "bookshelf", "desk", "cabinet", "wardrobe",
@@ -38,6 +68,39 @@ def extract_furniture_tiles(spritesheet_path, output_dir, tile_size=32):
         "fireplace", "tv_stand", "coffee_table", "lamp"
     ]
     
+    for rect, tile in tiles:
+        # Generar nombre basado en posición o lista predefinida
+        if tile_count < len(furniture_names):
+            name = furniture_names[tile_count]
+        else:
+            name = f"furniture_{tile_count:03d}"
+        
+        # Guardar el tile
+        tile_path = os.path.join(output_dir, f"tile_furniture_{name}.png")
+        tile.save(tile_path)
+        variants[os.path.basename(tile_path)] = save_scaled_variants(tile, tile_path, scales)
+        sprites[f"tile_furniture_{name}"] = np.asarray(tile.convert('RGBA'))
+        rects[f"tile_furniture_{name}"] = rect
+        print(f"Guardado: {tile_path}")
+        tile_count += 1
+    
+    print(f"Extraídos {tile_count} tiles de muebles")
+    
+    # Índice de variantes por devicePixelRatio, con la misma forma que 'variants' del catálogo
+    if variants:
+        with open(os.path.join(output_dir, "variants.json"), 'w') as f:
+            json.dump(variants, f, indent=2)
+    
+    if collision and sprites:
+        write_collision_sidecar(sprites, os.path.join(output_dir, "collision.json"))
+    
+    return rects
+
+def slice_tiles(img, tile_size):
+    """Recorrer un spritesheet fila a fila devolviendo (fila, columna, tile)"""
+    cols = img.width // tile_size
+    rows = img.height // tile_size
+    
     for row in range(rows):
         for col in range(cols):
             # Calcular coordenadas del tile
@@ -46,24 +109,364 @@ def extract_furniture_tiles(spritesheet_path, output_dir, tile_size=32):
             right = left + tile_size
             bottom = top + tile_size
             
-            # Extraer el tile
-            tile = img.crop((left, top, right, bottom))
-            
-            # Verificar si el tile no está vacío
-            if not is_tile_empty(tile):
-                # Generar nombre basado en posición o lista predefinida
-                if tile_count < len(furniture_names):
-                    name = furniture_names[tile_count]
-                else:
-                    name = f"furniture_{tile_count:03d}"
+            yield row, col, img.crop((left, top, right, bottom))
+
+def summed_area_table(mask):
+    """Tabla de áreas sumadas con una fila y columna de ceros delante"""
+    table = np.zeros((mask.shape[0] + 1, mask.shape[1] + 1), dtype=np.int64)
+    table[1:, 1:] = mask.cumsum(axis=0).cumsum(axis=1)
+    return table
+
+def rect_sum(table, x0, y0, x1, y1):
+    """Suma del rectángulo [x0, x1) x [y0, y1) en O(1); acepta arrays para consultas en lote"""
+    return table[y1, x1] - table[y0, x1] - table[y1, x0] + table[y0, x0]
+
+def plan_slices(img, pitches, offset_step=8, threshold=10, tolerance=0.01, dense=0.95):
+    """Elegir por cada banda del spritesheet la rejilla (tamaño y desfase) que no corta sprites
+    
+    Devuelve las celdas no vacías como (x, y, ancho, alto). Las bandas son tramos de filas
+    separados por filas transparentes; una rejilla se puntúa por los pares de píxeles opacos
+    adyacentes que sus líneas separan más los píxeles opacos que quedan fuera de sus celdas.
+    Cada banda empieza por debajo de las filas de celdas de la anterior, así que no se solapan.
+    Las celdas del borde derecho e inferior pueden salirse de la imagen (relleno transparente).
+    """
+    opaque = np.asarray(img.convert('RGBA'))[..., 3] > 0
+    height, width = opaque.shape
+    
+    # Relleno transparente de un paso a la derecha y abajo, como pad_to_tile_size
+    opaque = np.pad(opaque, ((0, max(ph for _, ph in pitches)), (0, max(pw for pw, _ in pitches))))
+    
+    # Tres tablas: ocupación y pares opacos adyacentes en horizontal y en vertical
+    occupancy = summed_area_table(opaque)
+    horizontal_pairs = summed_area_table(opaque[:, :-1] & opaque[:, 1:])
+    vertical_pairs = summed_area_table(opaque[:-1] & opaque[1:])
+    
+    row_counts = rect_sum(occupancy, 0, np.arange(height), width, np.arange(1, height + 1))
+    padded = np.concatenate([[False], row_counts > 0, [False]])
+    edges = np.flatnonzero(padded[1:] != padded[:-1])
+    
+    cells = {}
+    taken = 0
+    for y0, y1 in zip(edges[::2], edges[1::2]):
+        # Una banda que cabe entera en las filas de la anterior ya está dentro de sus celdas
+        if y1 <= taken:
+            continue
+        band_opaque = rect_sum(occupancy, 0, y0, width, y1)
+        candidates = []
+        
+        for pw, ph in pitches:
+            # Además de los desfases fijos, el alineado con la última fila ocupada
+            for oy in sorted(set(range(0, ph, offset_step)) | {taken % ph}):
+                # Filas de celdas que cubren la banda completa (la última puede salirse por abajo)
+                top = oy + (y0 - oy) // ph * ph
+                bottom = oy - (oy - y1) // ph * ph
                 
-                # Guardar el tile
-                tile_path = os.path.join(output_dir, f"tile_furniture_{name}.png")
-                tile.save(tile_path)
-                print(f"Guardado: {tile_path}")
-                tile_count += 1
+                # Las filas de celdas de bandas anteriores no se reutilizan
+                if taken > 0 and top < taken:
+                    top -= (top - taken) // ph * ph
+                if top < 0 or top >= bottom:
+                    continue
+                
+                for ox in range(0, min(pw, width), offset_step):
+                    # Columnas hasta cubrir el ancho; la última puede salirse por la derecha
+                    columns = -(-(width - ox) // pw)
+                    right = ox + columns * pw
+                    
+                    # Líneas verticales interiores: pares horizontales que separan
+                    xs = ox + np.arange(columns + 1) * pw
+                    xs = xs[(xs > 0) & (xs < width)]
+                    cuts = rect_sum(horizontal_pairs, xs - 1, top, xs, bottom).sum()
+                    
+                    # Líneas horizontales (incluidos los bordes de la banda si son interiores)
+                    ys = np.arange(top, bottom + 1, ph)
+                    ys = ys[(ys > 0) & (ys < height)]
+                    cuts += rect_sum(vertical_pairs, ox, ys - 1, right, ys).sum()
+                    
+                    # Píxeles de la banda que quedan fuera de las celdas
+                    cuts += band_opaque - rect_sum(occupancy, ox, max(y0, top), right, y1)
+                    candidates.append((int(cuts), pw * ph, pw, ph, ox, top, right, bottom))
+        
+        if not candidates:
+            print(f"Aviso: ninguna rejilla cubre la banda de filas {y0}-{y1}; sus sprites se omiten")
+            continue
+        
+        # La rejilla más pequeña que apenas corta sprites (también en bandas densas de props)
+        fits = [c for c in candidates if c[0] <= tolerance * band_opaque]
+        if fits:
+            best = min(fits, key=lambda c: (c[1], c[0]))
+        elif band_opaque >= dense * width * (y1 - y0):
+            # Bandas casi opacas (terreno continuo): cualquier línea corta, se usa el paso menor
+            best = min(candidates, key=lambda c: (c[1], c[4], c[5]))
+        else:
+            # Si ninguna encaja, la que menos corta
+            best = min(candidates)
+        
+        _, _, pw, ph, ox, top, right, bottom = best
+        taken = bottom
+        xs, ys = np.meshgrid(np.arange(ox, right, pw), np.arange(top, bottom, ph))
+        counts = rect_sum(occupancy, xs, ys, xs + pw, ys + ph)
+        for x, y in zip(xs[counts >= threshold], ys[counts >= threshold]):
+            cells[(int(x), int(y), pw, ph)] = True
     
-    print(f"Extraídos {tile_count} tiles de muebles")
+    return sorted(cells, key=lambda cell: (cell[1], cell[0]))
+
+def save_scaled_variants(tile, tile_path, scales=(2, 3, 4), min_mip_size=4):
+    """Guardar variantes HiDPI (nearest-neighbor) y mips junto al tile original
+    
+    Devuelve {sufijo: nombre de archivo} (p. ej. {'2x': 'mesa@2x.png', '0.5x': 'mesa@0.5x.png'}).
+    """
+    pixels = np.asarray(tile.convert('RGBA'))
+    stem, ext = os.path.splitext(tile_path)
+    written = {}
+    
+    def save(level, suffix):
+        path = f"{stem}@{suffix}{ext}"
+        Image.fromarray(level, 'RGBA').save(path)
+        written[suffix] = os.path.basename(path)
+    
+    # Escalado entero: repetir cada píxel factor x factor veces
+    for factor in scales:
+        save(pixels.repeat(factor, axis=0).repeat(factor, axis=1), f"{factor}x")
+    
+    # Mips: promedio 2x2 con alpha premultiplicado
+    level = pixels
+    divisor = 1
+    while min(level.shape[:2]) // 2 >= min_mip_size:
+        level = downscale_box(level)
+        divisor *= 2
+        save(level, f"{1 / divisor:g}x")
+    
+    return written
+
+def downscale_box(pixels):
+    """Reducir un array RGBA a la mitad promediando bloques 2x2"""
+    h, w = pixels.shape[0] // 2 * 2, pixels.shape[1] // 2 * 2
+    blocks = pixels[:h, :w].astype(np.float32).reshape(h // 2, 2, w // 2, 2, 4)
+    
+    alpha = blocks[..., 3:4]
+    alpha_sum = alpha.sum(axis=(1, 3))
+    color = (blocks[..., :3] * alpha).sum(axis=(1, 3))
+    color = np.divide(color, alpha_sum, out=np.zeros_like(color), where=alpha_sum > 0)
+    
+    return np.rint(np.concatenate([color, alpha_sum / 4], axis=-1)).astype(np.uint8)
+
+def write_collision_sidecar(sprites, sidecar_path, alpha_threshold=0, tolerance=0.5):
+    """Generar máscaras de colisión, cajas y contornos a partir del alpha de cada sprite"""
+    # Los sprites del mismo tamaño se procesan juntos en un único lote
+    by_shape = {}
+    for name, pixels in sprites.items():
+        by_shape.setdefault(pixels.shape[:2], []).append(name)
+    
+    sidecar = {}
+    for (height, width), names in by_shape.items():
+        masks = np.stack([sprites[name][..., 3] for name in names]) > alpha_threshold
+        packed = np.packbits(masks, axis=-1)
+        bboxes = compute_bounding_boxes(masks)
+        
+        # Máscara en filas de 'stride' bytes, bit más significativo primero (np.packbits)
+        for name, mask, bits, bbox in zip(names, masks, packed, bboxes):
+            sidecar[name] = {
+                'size': [width, height],
+                'bbox': bbox,
+                'stride': bits.shape[-1],
+                'mask': base64.b64encode(bits.tobytes()).decode('ascii'),
+                'polygons': trace_outlines(mask, tolerance)
+            }
+    
+    with open(sidecar_path, 'w') as f:
+        json.dump(sidecar, f, separators=(',', ':'))
+    
+    print(f"Colisiones: {len(sidecar)} sprites -> {sidecar_path}")
+    return sidecar
+
+def compute_bounding_boxes(masks):
+    """Cajas [x0, y0, x1, y1) ajustadas de un lote de máscaras (N, alto, ancho)"""
+    rows = masks.any(axis=2)
+    cols = masks.any(axis=1)
+    height, width = masks.shape[1:]
+    
+    top = rows.argmax(axis=1)
+    bottom = height - rows[:, ::-1].argmax(axis=1)
+    left = cols.argmax(axis=1)
+    right = width - cols[:, ::-1].argmax(axis=1)
+    
+    return [
+        [int(x0), int(y0), int(x1), int(y1)] if has_pixels else None
+        for x0, y0, x1, y1, has_pixels in zip(left, top, right, bottom, rows.any(axis=1))
+    ]
+
+def trace_outlines(mask, tolerance=0.5):
+    """Contornos exteriores simplificados de una máscara, como listas planas [x0, y0, x1, y1, ...]"""
+    padded = np.pad(mask, 1)
+    inner = padded[1:-1, 1:-1]
+    
+    # Aristas de borde orientadas de forma que cada región opaca queda a la izquierda
+    edges = []
+    for missing, start, end in (
+        (~padded[:-2, 1:-1], (1, 0), (0, 0)),   # arriba
+        (~padded[2:, 1:-1], (0, 1), (1, 1)),    # abajo
+        (~padded[1:-1, :-2], (0, 0), (0, 1)),   # izquierda
+        (~padded[1:-1, 2:], (1, 1), (1, 0)),    # derecha
+    ):
+        ys, xs = np.nonzero(inner & missing)
+        edges.extend(zip(zip(xs + start[0], ys + start[1]), zip(xs + end[0], ys + end[1])))
+    
+    outgoing = {}
+    for start, end in edges:
+        outgoing.setdefault((int(start[0]), int(start[1])), []).append((int(end[0]), int(end[1])))
+    
+    # Encadenar aristas en bucles cerrados. En un vértice compartido por dos píxeles que sólo
+    # se tocan en diagonal se gira a la izquierda: cada uno queda en su propio contorno
+    polygons = []
+    while outgoing:
+        origin = next(iter(outgoing))
+        loop = [origin]
+        point = origin
+        heading = None
+        while True:
+            targets = outgoing[point]
+            if heading is not None and len(targets) > 1:
+                targets.sort(key=lambda t: (t[0] - point[0]) * heading[1] - (t[1] - point[1]) * heading[0])
+            nxt = targets.pop()
+            heading = (nxt[0] - point[0], nxt[1] - point[1])
+            if not targets:
+                del outgoing[point]
+            if nxt == origin:
+                break
+            loop.append(nxt)
+            point = nxt
+        
+        # Área con signo negativa = contorno exterior; los huecos se descartan
+        xs = np.array([p[0] for p in loop])
+        ys = np.array([p[1] for p in loop])
+        area = (xs * np.roll(ys, -1) - np.roll(xs, -1) * ys).sum() / 2
+        if area < 0:
+            simplified = simplify_closed_polygon(loop, tolerance)
+            polygons.append((-area, [coord for point in simplified for coord in point]))
+    
+    polygons.sort(key=lambda item: item[0], reverse=True)
+    return [flat for _, flat in polygons]
+
+def simplify_closed_polygon(points, tolerance):
+    """Douglas-Peucker sobre un polígono cerrado, partiendo por el punto más lejano al origen"""
+    pts = np.array(points, dtype=np.float64)
+    
+    # Quitar primero los vértices colineales para que el bucle empiece en una esquina
+    before = pts - np.roll(pts, 1, axis=0)
+    after = np.roll(pts, -1, axis=0) - pts
+    pts = pts[before[:, 0] * after[:, 1] - before[:, 1] * after[:, 0] != 0]
+    if len(pts) <= 4:
+        return [(int(x), int(y)) for x, y in pts]
+    
+    far = int(np.argmax(((pts - pts[0]) ** 2).sum(axis=1)))
+    first = _douglas_peucker(pts[:far + 1], tolerance)
+    second = _douglas_peucker(np.vstack([pts[far:], pts[:1]]), tolerance)
+    
+    return [(int(x), int(y)) for x, y in np.vstack([first[:-1], second[:-1]])]
+
+def _douglas_peucker(pts, tolerance):
+    """Simplificación Douglas-Peucker de una polilínea abierta"""
+    if len(pts) <= 2:
+        return pts
+    
+    start, end = pts[0], pts[-1]
+    segment = end - start
+    length = np.hypot(*segment)
+    offsets = pts[1:-1] - start
+    if length == 0:
+        distances = np.hypot(offsets[:, 0], offsets[:, 1])
+    else:
+        distances = np.abs(segment[0] * offsets[:, 1] - segment[1] * offsets[:, 0]) / length
+    
+    index = int(np.argmax(distances)) + 1
+    if distances[index - 1] <= tolerance:
+        return np.vstack([start, end])
+    
+    left = _douglas_peucker(pts[:index + 1], tolerance)
+    right = _douglas_peucker(pts[index:], tolerance)
+    return np.vstack([left[:-1], right])
+
+def find_palette_remap(base_pixels, variant_pixels):
+    """Comprobar si variant es un recoloreado píxel a píxel de base y devolver (paleta_base, paleta_variante)"""
+    if base_pixels.shape != variant_pixels.shape:
+        return None
+    
+    # Los píxeles totalmente transparentes se normalizan: su RGB no es visible
+    base = np.where(base_pixels[..., 3:4] == 0, 0, base_pixels).astype(np.uint8)
+    variant = np.where(variant_pixels[..., 3:4] == 0, 0, variant_pixels).astype(np.uint8)
+    base_colors = np.ascontiguousarray(base).view('<u4')[..., 0].astype(np.uint64)
+    variant_colors = np.ascontiguousarray(variant).view('<u4')[..., 0].astype(np.uint64)
+    
+    # Cada par (color base, color variante) distinto; el mapeo debe ser una función del color base
+    pairs = np.unique((base_colors << np.uint64(32)) | variant_colors)
+    base_palette = (pairs >> np.uint64(32)).astype('<u4')
+    if len(np.unique(base_palette)) != len(pairs):
+        return None
+    
+    return base_palette, (pairs & np.uint64(0xFFFFFFFF)).astype('<u4')
+
+def write_palette_family(base_path, variant_paths, output_dir, family_name, tiles=None):
+    """Guardar una base indexada y una tabla de paleta por variante; devuelve las variantes derivadas
+    
+    tiles ({nombre: [x, y, ancho, alto]}) se guarda en la tabla para que cada tile de una
+    variante pueda recortarse de la base indexada con el mismo nombre que el tile original.
+    """
+    with Image.open(base_path) as img:
+        base_pixels = np.asarray(img.convert('RGBA'))
+    
+    palettes = {}
+    for variant_name, variant_path in variant_paths.items():
+        with Image.open(variant_path) as img:
+            remap = find_palette_remap(base_pixels, np.asarray(img.convert('RGBA')))
+        if remap is None:
+            print(f"{variant_name} no es un recoloreado de {os.path.basename(base_path)}")
+            continue
+        base_palette, palettes[variant_name] = remap
+    
+    if not palettes:
+        return {}
+    
+    # Un PNG indexado admite como máximo 256 entradas de paleta
+    if len(base_palette) > 256:
+        print(f"{os.path.basename(base_path)} tiene {len(base_palette)} colores (máximo 256): "
+              f"las variantes se extraen como tiles completos")
+        return {}
+    
+    base_colors = np.ascontiguousarray(np.where(base_pixels[..., 3:4] == 0, 0, base_pixels).astype(np.uint8))
+    indices = np.searchsorted(base_palette, base_colors.view('<u4')[..., 0]).astype(np.uint8)
+    indexed = Image.fromarray(indices, 'P')
+    indexed.putpalette(base_palette.view(np.uint8).tobytes(), rawmode='RGBA')
+    
+    os.makedirs(output_dir, exist_ok=True)
+    indexed_path = os.path.join(output_dir, f"{family_name}_indexed.png")
+    indexed.save(indexed_path)
+    
+    def as_rgba(palette):
+        return palette.view(np.uint8).reshape(-1, 4).tolist()
+    
+    table = {
+        'base': os.path.basename(indexed_path),
+        'palettes': {family_name: as_rgba(base_palette)}
+    }
+    table['palettes'].update({name: as_rgba(palette) for name, palette in palettes.items()})
+    if tiles:
+        table['tiles'] = tiles
+    
+    table_path = os.path.join(output_dir, f"{family_name}_palettes.json")
+    with open(table_path, 'w') as f:
+        json.dump(table, f, separators=(',', ':'))
+    
+    for variant_name in palettes:
+        variant_bytes = os.path.getsize(variant_paths[variant_name])
+        palette_bytes = len(json.dumps(table['palettes'][variant_name], separators=(',', ':')))
+        print(f"{variant_name}: paleta de {palette_bytes} bytes en lugar de {variant_bytes} bytes de spritesheet")
+    
+    # La base indexada y la tabla también se descargan: el ahorro real es contra todas las variantes
+    family_bytes = os.path.getsize(indexed_path) + os.path.getsize(table_path)
+    variants_bytes = sum(os.path.getsize(variant_paths[name]) for name in palettes)
+    print(f"{family_name}: {family_bytes} bytes (base indexada + tabla) frente a {variants_bytes} bytes de variantes")
+    
+    return palettes
 
 def is_tile_empty(tile, threshold=10):
     """Verificar si un tile está mayormente vacío"""
@@ -83,9 +486,214 @@ def is_tile_empty(tile, threshold=10):
     
     return non_transparent < threshold
 
+# Formato del banco de tiles (little-endian)
+#
+#   Cabecera sin comprimir (16 bytes):
+#     magic 'DTBK' | versión u16 | bytes por índice u8 | reservado u8
+#     ancho u16 | alto u16 | número de tiles u32
+#   Cuerpo comprimido con zlib (DecompressionStream('deflate') en el navegador):
+#     colores u32 | paleta RGBA (colores * 4 bytes)
+#     offsets u32 * número de tiles (bytes desde el inicio de los píxeles)
+#     longitud de nombres u32 | nombres UTF-8 separados por '\n'
+#     relleno hasta múltiplo de 4 | píxeles indexados (u8 o u16 por píxel)
+TILE_BANK_MAGIC = b'DTBK'
+TILE_BANK_VERSION = 1
+TILE_BANK_HEADER = struct.Struct('<4sHBBHHI')
+
+def pack_tile_bank(png_paths, bank_path, tile_size=16, root=None):
+    """Empaquetar PNGs en un banco binario con paleta compartida"""
+    names = []
+    tiles = []
+    
+    for png_path in png_paths:
+        with Image.open(png_path) as img:
+            img = pad_to_tile_size(img.convert('RGBA'), tile_size)
+            name = os.path.splitext(os.path.relpath(png_path, root) if root else os.path.basename(png_path))[0]
+            cells = list(slice_tiles(img, tile_size))
+        
+        # Las imágenes mayores que un tile se guardan celda a celda
+        for row, col, tile in cells:
+            names.append(name if len(cells) == 1 else f"{name}#{row}_{col}")
+            tiles.append(np.asarray(tile))
+    
+    if not tiles:
+        print("No hay tiles para empaquetar")
+        return None
+    
+    # Paleta compartida: cada color RGBA visto como un único uint32
+    pixels = np.ascontiguousarray(np.stack(tiles)).view('<u4')[..., 0]
+    palette, indices = np.unique(pixels, return_inverse=True)
+    
+    # El formato sólo admite índices de 1 o 2 bytes: más colores corromperían los índices
+    if len(palette) > 65536:
+        raise ValueError(f"El banco de tiles admite como máximo 65536 colores; hay {len(palette)}")
+    index_bytes = 1 if len(palette) <= 256 else 2
+    indices = indices.reshape(pixels.shape).astype(np.uint8 if index_bytes == 1 else '<u2')
+    
+    tile_bytes = tile_size * tile_size * index_bytes
+    offsets = np.arange(len(tiles), dtype='<u4') * tile_bytes
+    names_blob = '\n'.join(names).encode('utf-8')
+    
+    body = bytearray()
+    body += struct.pack('<I', len(palette))
+    body += palette.astype('<u4').tobytes()
+    body += offsets.tobytes()
+    body += struct.pack('<I', len(names_blob))
+    body += names_blob
+    body += b'\0' * (-len(body) % 4)
+    body += indices.tobytes()
+    
+    header = TILE_BANK_HEADER.pack(TILE_BANK_MAGIC, TILE_BANK_VERSION, index_bytes, 0,
+                                   tile_size, tile_size, len(tiles))
+    with open(bank_path, 'wb') as f:
+        f.write(header + zlib.compress(bytes(body), 9))
+    
+    print(f"Banco de tiles: {len(tiles)} tiles, {len(palette)} colores -> {bank_path}")
+    return bank_path
+
+def pad_to_tile_size(img, tile_size):
+    """Rellenar con transparencia hasta un múltiplo del tile para no perder ni recortar píxeles"""
+    return pad_to_size(img, -(-img.width // tile_size) * tile_size, -(-img.height // tile_size) * tile_size)
+
+def pad_to_size(img, width, height):
+    """Rellenar con transparencia por la derecha y por abajo hasta al menos ancho x alto"""
+    width = max(width, img.width)
+    height = max(height, img.height)
+    if (width, height) == img.size:
+        return img
+    
+    padded = Image.new('RGBA', (width, height), (0, 0, 0, 0))
+    padded.paste(img, (0, 0))
+    return padded
+
+def read_tile_bank(bank_path):
+    """Leer un banco de tiles y devolver {nombre: array RGBA}"""
+    with open(bank_path, 'rb') as f:
+        data = f.read()
+    
+    magic, version, index_bytes, _, width, height, count = TILE_BANK_HEADER.unpack_from(data)
+    if magic != TILE_BANK_MAGIC or version != TILE_BANK_VERSION:
+        raise ValueError(f"Banco de tiles no soportado: {magic!r} v{version}")
+    
+    body = zlib.decompress(data[TILE_BANK_HEADER.size:])
+    pos = 0
+    
+    (palette_size,) = struct.unpack_from('<I', body, pos)
+    pos += 4
+    palette = np.frombuffer(body, '<u4', palette_size, pos)
+    pos += palette_size * 4
+    offsets = np.frombuffer(body, '<u4', count, pos)
+    pos += count * 4
+    (names_len,) = struct.unpack_from('<I', body, pos)
+    pos += 4
+    names = body[pos:pos + names_len].decode('utf-8').split('\n')
+    pos += names_len
+    pos += -pos % 4
+    
+    index_dtype = np.uint8 if index_bytes == 1 else '<u2'
+    tile_pixels = width * height
+    tiles = {}
+    for name, offset in zip(names, offsets):
+        indices = np.frombuffer(body, index_dtype, tile_pixels, pos + int(offset))
+        rgba = palette[indices].astype('<u4').view(np.uint8)
+        tiles[name] = rgba.reshape(height, width, 4)
+    
+    return tiles
+
+def compare_tile_bank(png_paths, bank_path, tile_size=16, root=None):
+    """Comparar tamaño y tiempo de decodificación del banco frente a los PNG"""
+    png_bytes = sum(os.path.getsize(p) for p in png_paths)
+    
+    start = time.perf_counter()
+    decoded = {}
+    for png_path in png_paths:
+        with Image.open(png_path) as img:
+            name = os.path.splitext(os.path.relpath(png_path, root) if root else os.path.basename(png_path))[0]
+            decoded[name] = np.asarray(pad_to_tile_size(img.convert('RGBA'), tile_size))
+    png_time = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    tiles = read_tile_bank(bank_path)
+    bank_time = time.perf_counter() - start
+    
+    # Verificación de ida y vuelta: cada celda de cada PNG debe estar en el banco y coincidir
+    mismatches = 0
+    missing = 0
+    expected = set()
+    for name, source in decoded.items():
+        rows, cols = source.shape[0] // tile_size, source.shape[1] // tile_size
+        for row in range(rows):
+            for col in range(cols):
+                key = name if rows * cols == 1 else f"{name}#{row}_{col}"
+                expected.add(key)
+                if key not in tiles:
+                    missing += 1
+                    continue
+                cell = source[row * tile_size:(row + 1) * tile_size, col * tile_size:(col + 1) * tile_size]
+                if not np.array_equal(cell, tiles[key]):
+                    mismatches += 1
+    unexpected = len(set(tiles) - expected)
+    
+    bank_bytes = os.path.getsize(bank_path)
+    print(f"PNG: {len(png_paths)} archivos, {png_bytes} bytes, decodificación {png_time * 1000:.1f} ms")
+    print(f"Banco: 1 archivo, {bank_bytes} bytes, decodificación {bank_time * 1000:.1f} ms")
+    print(f"Ahorro: {100 * (1 - bank_bytes / png_bytes):.1f}% | tiles distintos: {mismatches} | "
+          f"ausentes: {missing} | sobrantes: {unexpected}")
+    
+    return {
+        'png_files': len(png_paths),
+        'png_bytes': png_bytes,
+        'png_decode_ms': png_time * 1000,
+        'bank_bytes': bank_bytes,
+        'bank_decode_ms': bank_time * 1000,
+        'mismatches': mismatches,
+        'missing': missing,
+        'unexpected': unexpected
+    }
+
 def main():
     """Función principal"""
-    base_dir = "/home/stev/Documentos/repos/Personal/duo-eterno/public/assets"
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Extrae muebles de spritesheets y empaqueta tiles")
+    parser.add_argument("--assets", default="/home/stev/Documentos/repos/Personal/duo-eterno/public/assets",
+                        help="Directorio public/assets del proyecto")
+    parser.add_argument("--tile-bank", metavar="SALIDA",
+                        help="Empaquetar terrain, roads y water en un banco binario de tiles")
+    parser.add_argument("--collision", metavar="SALIDA",
+                        help="Generar el sidecar de colisiones de entities y props")
+    parser.add_argument("--pitches", nargs="+", metavar="ANCHOxALTO",
+                        help="Tamaños de tile a evaluar por región (p. ej. 16x16 32x32 48x64)")
+    args = parser.parse_args()
+    
+    pitches = [tuple(int(v) for v in pitch.split("x")) for pitch in args.pitches] if args.pitches else None
+    
+    base_dir = args.assets
+    
+    if args.tile_bank:
+        png_paths = sorted(
+            path
+            for folder in ("terrain", "roads", "water")
+            for path in glob.glob(os.path.join(base_dir, folder, "**", "*.png"), recursive=True)
+        )
+        try:
+            packed = pack_tile_bank(png_paths, args.tile_bank, tile_size=16, root=base_dir)
+        except ValueError as e:
+            print(e)
+            sys.exit(1)
+        if packed:
+            compare_tile_bank(png_paths, args.tile_bank, tile_size=16, root=base_dir)
+        return
+    
+    if args.collision:
+        sprites = {}
+        for folder in ("entities", "props"):
+            for path in sorted(glob.glob(os.path.join(base_dir, folder, "**", "*.png"), recursive=True)):
+                with Image.open(path) as img:
+                    name = os.path.splitext(os.path.relpath(path, base_dir))[0]
+                    sprites[name] = np.asarray(img.convert('RGBA'))
+        write_collision_sidecar(sprites, args.collision)
+        return
     
     # Rutas de archivos
     furniture_dir = os.path.join(base_dir, "Furniture")
@@ -95,18 +703,27 @@ def main():
     spritesheet_path = os.path.join(furniture_dir, "dark-wood-furniture.png")
     furniture_output = os.path.join(tiles_dir, "furniture")
     
+    furniture_rects = {}
     if os.path.exists(spritesheet_path):
         os.makedirs(furniture_output, exist_ok=True)
-        extract_furniture_tiles(spritesheet_path, furniture_output, tile_size=32)
+        furniture_rects = extract_furniture_tiles(spritesheet_path, furniture_output, tile_size=32, pitches=pitches)
     else:
         print(f"No se encontró spritesheet en: {spritesheet_path}")
     
     # También procesar el spritesheet de madera clara si existe
     blonde_spritesheet = os.path.join(furniture_dir, "blonde-wood-furniture.png")
+    if os.path.exists(blonde_spritesheet) and os.path.exists(spritesheet_path):
+        # Si es un recoloreado de la madera oscura basta con su tabla de paleta: cada tile
+        # tile_furniture_* se recorta de furniture_indexed.png con su rectángulo de la tabla
+        derived = write_palette_family(spritesheet_path, {"furniture_light": blonde_spritesheet},
+                                       tiles_dir, "furniture", tiles=furniture_rects)
+        if derived:
+            return
+    
     if os.path.exists(blonde_spritesheet):
         blonde_output = os.path.join(tiles_dir, "furniture_light")
         os.makedirs(blonde_output, exist_ok=True)
-        extract_furniture_tiles(blonde_spritesheet, blonde_output, tile_size=32)
+        extract_furniture_tiles(blonde_spritesheet, blonde_output, tile_size=32, pitches=pitches)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
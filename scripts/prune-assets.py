@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Script para eliminar assets no referenciados desde src/ y generar un árbol de build podado
+"""
+
+import os
+import re
+import sys
+import bisect
+import json
+import shutil
+
+SOURCE_EXTENSIONS = ('.ts', '.tsx', '.js', '.jsx')
+
+# Comentarios (se descartan) y literales entre comillas simples, dobles o plantillas `${...}`
+STRING_LITERAL = re.compile(
+    r"//[^\n]*|/\*.*?\*/"
+    r"|'((?:[^'\\\n]|\\.)*)'|\"((?:[^\"\\\n]|\\.)*)\"|`((?:[^`\\]|\\.)*)`",
+    re.S
+)
+TEMPLATE_EXPRESSION = re.compile(r"\$\{[^}]*\}")
+
+def collect_literals(src_dir):
+    """Recoger literales estáticos y patrones de plantilla de todo el código fuente"""
+    literals = set()
+    templates = set()
+
+    for root, dirs, names in os.walk(src_dir):
+        # Los tests no forman parte del bundle
+        dirs[:] = [d for d in dirs if d != '__tests__']
+        for name in names:
+            if not name.endswith(SOURCE_EXTENSIONS):
+                continue
+            with open(os.path.join(root, name), encoding='utf-8') as f:
+                source = f.read()
+
+            for single, double, template in STRING_LITERAL.findall(source):
+                text = single or double or template
+                if template and TEMPLATE_EXPRESSION.search(template):
+                    templates.add(tuple(TEMPLATE_EXPRESSION.split(template)))
+                elif text:
+                    literals.add(text)
+
+    return literals, templates
+
+class AssetIndex:
+    """Índice de assets por ruta relativa, nombre de archivo y stem para búsquedas O(1)"""
+
+    def __init__(self, assets_dir):
+        self.assets_dir = assets_dir
+        self.paths = []
+        self.by_key = {}
+
+        for root, _, names in os.walk(assets_dir):
+            for name in names:
+                relative = os.path.relpath(os.path.join(root, name), assets_dir).replace(os.sep, '/')
+                self.paths.append(relative)
+
+        self.paths.sort()
+        for relative in self.paths:
+            stem = os.path.splitext(relative)[0]
+            for key in (relative, stem, os.path.basename(relative), os.path.basename(stem)):
+                self.by_key.setdefault(key, set()).add(relative)
+
+    def lookup(self, literal):
+        """Assets a los que puede referirse un literal exacto"""
+        key = literal.split('?')[0].lstrip('/')
+        if key.startswith('assets/'):
+            key = key[len('assets/'):]
+        return self.by_key.get(key, set())
+
+    def match_template(self, parts):
+        """Assets que encajan con una plantilla, acotando candidatos por su prefijo estático"""
+        prefix = parts[0].lstrip('/')
+        if not prefix.startswith('assets/'):
+            return set()
+        prefix = prefix[len('assets/'):]
+
+        # Una plantilla sin texto estático tras /assets/ (p. ej. `/assets/${folder}/${file}`)
+        # es el cargador genérico por carpetas, que se modela con el manifiesto
+        if not ''.join(parts[1:]).strip('/').replace('.png', '') and not prefix.strip('/'):
+            return set()
+
+        pattern = re.compile('.*'.join(re.escape(part) for part in (prefix,) + parts[1:]))
+        start = bisect.bisect_left(self.paths, prefix)
+        matches = set()
+        for relative in self.paths[start:]:
+            if not relative.startswith(prefix):
+                break
+            # Coincidencia por prefijo: la ruta suele completarse con más concatenaciones
+            if pattern.match(relative):
+                matches.add(relative)
+        return matches
+
+def find_reachable_assets(src_dir, assets_dir, manifest_path):
+    """Calcular el conjunto de assets alcanzables desde src/"""
+    index = AssetIndex(assets_dir)
+    literals, templates = collect_literals(src_dir)
+    reachable = set()
+
+    # Cargas por carpeta: cualquier literal que nombre una carpeta del manifiesto
+    # carga todos sus archivos conocidos (modernAssetManager.loadAssetsByFolderName)
+    with open(manifest_path, encoding='utf-8') as f:
+        asset_map = json.load(f).get('assetMap', {})
+    loaded_folders = sorted(folder for folder in asset_map if folder in literals)
+    for folder in loaded_folders:
+        for asset in asset_map[folder]:
+            file_name = asset if asset.endswith('.png') else f"{asset}.png"
+            reachable |= index.lookup(f"{folder}/{file_name}")
+
+    for literal in literals:
+        reachable |= index.lookup(literal)
+    for parts in templates:
+        reachable |= index.match_template(parts)
+
+    return index, reachable, loaded_folders
+
+def check_output_dir(output_dir, protected_dirs):
+    """Impedir que output_dir sea, contenga o esté dentro de un directorio que no se debe borrar"""
+    output = os.path.realpath(output_dir)
+    for protected in protected_dirs:
+        protected = os.path.realpath(protected)
+        if os.path.commonpath([output, protected]) in (output, protected):
+            raise ValueError(f"El directorio de salida {output_dir} se solapa con {protected}; se rechaza usarlo")
+
+def prune_assets(src_dir, assets_dir, manifest_path, output_dir, report_path=None):
+    """Copiar sólo los assets alcanzables a output_dir y devolver el informe"""
+    # output_dir se borra entero: no puede ser assets/ ni src/, un ancestro ni un subdirectorio suyo
+    check_output_dir(output_dir, (assets_dir, src_dir))
+    index, reachable, loaded_folders = find_reachable_assets(src_dir, assets_dir, manifest_path)
+
+    if os.path.exists(output_dir):
+        shutil.rmtree(output_dir)
+
+    kept_bytes = 0
+    removed = {}
+    for relative in index.paths:
+        source = os.path.join(assets_dir, relative)
+        size = os.path.getsize(source)
+        if relative in reachable:
+            target = os.path.join(output_dir, relative)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            shutil.copy2(source, target)
+            kept_bytes += size
+        else:
+            removed[relative] = size
+
+    report = {
+        'total_files': len(index.paths),
+        'kept_files': len(reachable),
+        'removed_files': len(removed),
+        'kept_bytes': kept_bytes,
+        'removed_bytes': sum(removed.values()),
+        'loaded_folders': loaded_folders,
+        'removed': removed
+    }
+
+    if report_path:
+        with open(report_path, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    print(f"Assets: {report['total_files']} | conservados: {report['kept_files']} "
+          f"({kept_bytes} bytes) | eliminados: {report['removed_files']} ({report['removed_bytes']} bytes)")
+    return report
+
+def main():
+    """Función principal"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Poda los assets que el juego no referencia")
+    parser.add_argument("output", help="Directorio de salida con el árbol de assets podado")
+    parser.add_argument("--src", default="src", help="Directorio de código fuente")
+    parser.add_argument("--assets", default="public/assets", help="Directorio de assets")
+    parser.add_argument("--manifest", default="src/generated/asset-analysis.json",
+                        help="Manifiesto de assets por carpeta")
+    parser.add_argument("--report", help="Ruta del informe JSON con los archivos eliminados")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.assets):
+        print(f"No se encontró el directorio de assets: {args.assets}")
+        sys.exit(1)
+
+    try:
+        prune_assets(args.src, args.assets, args.manifest, args.output, args.report)
+    except ValueError as e:
+        print(e)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""
+Pruebas del banco de tiles, del troceado por rejillas y de las colisiones de extract-furniture.py
+"""
+
+import base64
+import importlib.util
+import os
+
+import numpy as np
+import pytest
+from PIL import Image
+
+SCRIPT = os.path.join(os.path.dirname(__file__), "extract-furniture.py")
+spec = importlib.util.spec_from_file_location("extract_furniture", SCRIPT)
+extract_furniture = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(extract_furniture)
+
+def _write_png(path, size, seed, mode='RGBA'):
+    rng = np.random.default_rng(seed)
+    pixels = rng.integers(0, 4, size[::-1] + (4,), dtype=np.uint8) * 60
+    pixels[..., 3] = np.where(pixels[..., 3] > 0, 255, 0)
+    img = Image.fromarray(pixels, 'RGBA')
+    if mode != 'RGBA':
+        img = img.convert(mode)
+    img.save(path)
+    return str(path)
+
+def test_tile_bank_round_trip(tmp_path):
+    png_paths = [
+        _write_png(tmp_path / "single.png", (16, 16), 1),
+        _write_png(tmp_path / "sheet.png", (48, 32), 2),
+        _write_png(tmp_path / "rgb.png", (16, 16), 3, mode='RGB'),
+        _write_png(tmp_path / "small.png", (8, 8), 4),
+        _write_png(tmp_path / "ragged.png", (20, 16), 5),
+    ]
+    bank_path = str(tmp_path / "tiles.dtbk")
+    
+    extract_furniture.pack_tile_bank(png_paths, bank_path, tile_size=16)
+    tiles = extract_furniture.read_tile_bank(bank_path)
+    
+    # 1 + 3x2 + 1 + 1 (8x8 rellenado) + 2 (20x16 rellenado a 32x16)
+    assert len(tiles) == 11
+    assert tiles["small"].shape == (16, 16, 4)
+    assert not tiles["small"][8:, :, 3].any()
+    
+    with Image.open(png_paths[1]) as img:
+        sheet = np.asarray(img.convert('RGBA'))
+    assert np.array_equal(tiles["sheet#1_2"], sheet[16:32, 32:48])
+    
+    report = extract_furniture.compare_tile_bank(png_paths, bank_path, tile_size=16)
+    assert report["mismatches"] == 0
+    assert report["missing"] == 0
+    assert report["unexpected"] == 0
+
+def test_compare_reports_sources_missing_from_bank(tmp_path):
+    packed = [_write_png(tmp_path / "a.png", (16, 16), 1)]
+    extra = _write_png(tmp_path / "b.png", (16, 16), 2)
+    bank_path = str(tmp_path / "tiles.dtbk")
+    
+    extract_furniture.pack_tile_bank(packed, bank_path, tile_size=16)
+    report = extract_furniture.compare_tile_bank(packed + [extra], bank_path, tile_size=16)
+    
+    assert report["missing"] == 1
+
+def _sheet(size, rects):
+    pixels = np.zeros(size[::-1] + (4,), dtype=np.uint8)
+    for x0, y0, x1, y1 in rects:
+        pixels[y0:y1, x0:x1] = (120, 80, 40, 255)
+    return Image.fromarray(pixels, 'RGBA')
+
+def test_plan_slices_keeps_dense_props_whole():
+    # Dos props opacos de 46x62 con 1 px de margen: la banda es densa pero 48x64 no corta nada
+    sheet = _sheet((96, 64), [(1, 1, 47, 63), (49, 1, 95, 63)])
+    cells = extract_furniture.plan_slices(sheet, [(16, 16), (32, 32), (48, 64)])
+    assert cells == [(0, 0, 48, 64), (48, 0, 48, 64)]
+
+def test_plan_slices_cells_do_not_overlap():
+    # La segunda banda empieza dentro de la última fila de celdas de la primera
+    sheet = _sheet((64, 64), [(2, 2, 30, 22), (2, 24, 14, 36)])
+    cells = extract_furniture.plan_slices(sheet, [(16, 16), (32, 32)])
+    for i, (ax, ay, aw, ah) in enumerate(cells):
+        for bx, by, bw, bh in cells[i + 1:]:
+            assert ax + aw <= bx or bx + bw <= ax or ay + ah <= by or by + bh <= ay
+
+def _covers_all_opaque(sheet, cells):
+    opaque = np.asarray(sheet)[..., 3] > 0
+    covered = np.zeros((opaque.shape[0] + 64, opaque.shape[1] + 64), dtype=bool)
+    for x, y, w, h in cells:
+        covered[y:y + h, x:x + w] = True
+    return not (opaque & ~covered[:opaque.shape[0], :opaque.shape[1]]).any()
+
+def test_plan_slices_pads_bands_past_the_sheet_edge():
+    # Prop en las filas 30-36 de una hoja de 36 de alto: la rejilla se sale por abajo
+    sheet = _sheet((32, 36), [(4, 30, 20, 36)])
+    cells = extract_furniture.plan_slices(sheet, [(16, 16), (32, 32)])
+    assert cells and _covers_all_opaque(sheet, cells)
+
+def test_plan_slices_keeps_ragged_opaque_sheets():
+    sheet = _sheet((20, 20), [(0, 0, 20, 20)])
+    cells = extract_furniture.plan_slices(sheet, [(16, 16)])
+    assert cells == [(0, 0, 16, 16), (16, 0, 16, 16), (0, 16, 16, 16), (16, 16, 16, 16)]
+    
+    # Sin bandas previas no se recorta el principio de la hoja
+    sheet = _sheet((40, 40), [(0, 0, 40, 40)])
+    cells = extract_furniture.plan_slices(sheet, [(32, 32)])
+    assert cells[0] == (0, 0, 32, 32)
+    assert _covers_all_opaque(sheet, cells)
+
+def _collision(tmp_path, masks):
+    sprites = {}
+    for name, mask in masks.items():
+        pixels = np.zeros(mask.shape + (4,), dtype=np.uint8)
+        pixels[..., 3] = np.where(mask, 255, 0)
+        sprites[name] = pixels
+    return extract_furniture.write_collision_sidecar(sprites, str(tmp_path / "collision.json"))
+
+def _corners(flat):
+    return set(zip(flat[::2], flat[1::2]))
+
+def test_collision_rectangle_and_ring(tmp_path):
+    rect = np.zeros((5, 6), dtype=bool)
+    rect[1:4, 1:5] = True
+    ring = np.zeros((5, 5), dtype=bool)
+    ring[1:4, 1:4] = True
+    ring[2, 2] = False
+    sidecar = _collision(tmp_path, {"rect": rect, "ring": ring})
+    
+    assert sidecar["rect"]["bbox"] == [1, 1, 5, 4]
+    assert [_corners(p) for p in sidecar["rect"]["polygons"]] == [{(1, 1), (5, 1), (5, 4), (1, 4)}]
+    
+    # Sólo el contorno exterior: el hueco central se descarta
+    assert [_corners(p) for p in sidecar["ring"]["polygons"]] == [{(1, 1), (4, 1), (4, 4), (1, 4)}]
+
+def test_collision_diagonal_pixels_get_separate_outlines(tmp_path):
+    mask = np.zeros((4, 4), dtype=bool)
+    mask[1, 1] = mask[2, 2] = True
+    polygons = _collision(tmp_path, {"diagonal": mask})["diagonal"]["polygons"]
+    
+    assert sorted(map(sorted, map(_corners, polygons))) == [
+        [(1, 1), (1, 2), (2, 1), (2, 2)],
+        [(2, 2), (2, 3), (3, 2), (3, 3)],
+    ]
+
+def test_collision_empty_mask(tmp_path):
+    entry = _collision(tmp_path, {"empty": np.zeros((8, 8), dtype=bool)})["empty"]
+    assert entry["bbox"] is None
+    assert entry["polygons"] == []
+
+def test_collision_mask_round_trip(tmp_path):
+    mask = np.random.default_rng(0).random((7, 11)) > 0.5
+    entry = _collision(tmp_path, {"sprite": mask})["sprite"]
+    
+    width, height = entry["size"]
+    bits = np.frombuffer(base64.b64decode(entry["mask"]), dtype=np.uint8)
+    assert entry["stride"] == 2
+    unpacked = np.unpackbits(bits.reshape(height, entry["stride"]), axis=-1)[:, :width]
+    assert np.array_equal(unpacked.astype(bool), mask)
+
+def test_tile_bank_rejects_more_than_65536_colours(tmp_path):
+    colours = np.arange(65537, dtype='<u4').view(np.uint8).reshape(-1, 4).copy()
+    colours[:, 3] = 255
+    pixels = np.zeros((16 * 258 * 16, 4), dtype=np.uint8)
+    pixels[:len(colours)] = colours
+    path = tmp_path / "colours.png"
+    Image.fromarray(pixels.reshape(16 * 258, 16, 4), 'RGBA').save(path)
+    
+    with pytest.raises(ValueError):
+        extract_furniture.pack_tile_bank([str(path)], str(tmp_path / "tiles.dtbk"), tile_size=16)
+    assert not (tmp_path / "tiles.dtbk").exists()